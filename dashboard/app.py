@@ -7,7 +7,7 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from datetime import date, timedelta
 import snowflake.connector
 
 # Page configuration
@@ -38,33 +38,373 @@ st.markdown("""
 
 @st.cache_resource
 def init_connection():
-    """Initialize Snowflake connection"""
+    """Initialize Snowflake connection and resume the warehouse"""
+    conn = None
     try:
-        return snowflake.connector.connect(
+        conn = snowflake.connector.connect(
             user=st.secrets["snowflake"]["user"],
             password=st.secrets["snowflake"]["password"],
             account=st.secrets["snowflake"]["account"],
             warehouse=st.secrets["snowflake"]["warehouse"],
             database=st.secrets["snowflake"]["database"],
-            schema=st.secrets["snowflake"]["schema"]
+            schema=st.secrets["snowflake"]["schema"],
+            client_session_keep_alive=True,
+            login_timeout=10,
+            session_parameters={'QUERY_TAG': 'retail_dashboard'}
         )
+        # Resume the warehouse now rather than on the first dashboard query.
+        # A constant query like SELECT 1 is answered without a warehouse.
+        with conn.cursor() as cur:
+            cur.execute(
+                "ALTER WAREHOUSE IDENTIFIER(%(warehouse)s) RESUME IF SUSPENDED",
+                {'warehouse': st.secrets["snowflake"]["warehouse"]}
+            )
+        return conn
     except Exception as e:
+        if conn is not None:
+            conn.close()
         st.error(f"Connection error: {e}")
         return None
 
+# Low-cardinality label columns stored as pandas categoricals (int codes plus
+# one copy of each label) rather than one Python string object per row.
+# Columns used as a px treemap path or color stay strings: px groups on them
+# with observed=False, which adds a zero row for every unused combination.
+CATEGORICAL_COLUMNS = {'KIND', 'CATEGORY', 'CUSTOMER_SEGMENT'}
+
 @st.cache_data(ttl=600)
-def run_query(query):
-    """Run a query and return results as dataframe"""
+def run_query(query, params=None):
+    """Run a query with optional bind parameters and return results as dataframe"""
     try:
         conn = init_connection()
         if conn is None:
             return pd.DataFrame()
-        df = pd.read_sql(query, conn)
+        with conn.cursor() as cur:
+            cur.execute(query, params)
+            df = cur.fetch_pandas_all()
+        for column in CATEGORICAL_COLUMNS.intersection(df.columns):
+            df[column] = df[column].astype('category')
         return df
     except Exception as e:
         st.error(f"Query error: {e}")
         return pd.DataFrame()
 
+@st.cache_data(ttl=3600)
+def get_filter_options():
+    """Fetch category and store type filter options in a single query"""
+    options_query = """
+    SELECT DISTINCT category, store_type
+    FROM agg_sales_daily
+    WHERE category IS NOT NULL
+        OR store_type IS NOT NULL
+    """
+    options_df = run_query(options_query)
+    
+    if options_df.empty:
+        return [], []
+    
+    categories = sorted(options_df['CATEGORY'].dropna().unique().tolist())
+    store_types = sorted(options_df['STORE_TYPE'].dropna().unique().tolist())
+    return categories, store_types
+
+# fact_sales columns read for the KPIs and top products; everything else is
+# left unscanned. The other panels read the agg_sales_daily rollup instead.
+FACT_SALES_COLUMNS = [
+    'transaction_id', 'transaction_date', 'customer_id', 'product_id', 'quantity',
+    'total_amount', 'gross_profit', 'category', 'store_type'
+]
+SALES_DAILY_COLUMNS = [
+    'transaction_date', 'category', 'store_type', 'store_city', 'day_type',
+    'customer_segment', 'loyalty_member', 'total_revenue', 'line_items',
+    'customers_hll'
+]
+
+# Traces with strictly more points than this are drawn with WebGL instead of SVG
+SCATTERGL_MIN_ROWS = 1000
+
+# Scatter sources with strictly more rows than this (row count > 50k) are
+# binned in Snowflake and drawn as a density heatmap instead of shipping every
+# point to the browser
+SCATTER_BIN_MIN_ROWS = 50000
+
+def bin_2d(source_sql, x, y, nx=200, ny=200):
+    """
+    Build a query counting source rows in an nx by ny grid over numeric columns x and y
+    Returns the 1-based bin indices of each non-empty cell with the grid bounds
+    """
+    return f"""
+    WITH source AS (
+        {source_sql}
+    ),
+    bounds AS (
+        SELECT
+            MIN({x}) AS x_min,
+            IFF(MAX({x}) > MIN({x}), MAX({x}), MIN({x}) + 1) AS x_max,
+            MIN({y}) AS y_min,
+            IFF(MAX({y}) > MIN({y}), MAX({y}), MIN({y}) + 1) AS y_max
+        FROM source
+    ),
+    binned AS (
+        SELECT
+            LEAST(WIDTH_BUCKET(source.{x}, x_min, x_max, {nx}), {nx}) AS bin_x,
+            LEAST(WIDTH_BUCKET(source.{y}, y_min, y_max, {ny}), {ny}) AS bin_y,
+            COUNT(*) AS row_count
+        FROM source, bounds
+        WHERE source.{x} IS NOT NULL
+            AND source.{y} IS NOT NULL
+        GROUP BY bin_x, bin_y
+    )
+    SELECT bin_x, bin_y, row_count, x_min, x_max, y_min, y_max
+    FROM binned, bounds
+    """
+
+def plot_scatter(source_sql, x, y, params=None, nx=200, ny=200):
+    """
+    Plot column y against column x, binning server-side when the source is large
+    Not used by any panel yet; scaffolding for future transaction-level charts
+    """
+    row_count = run_query(f"SELECT COUNT(*) AS row_count FROM ({source_sql})", params)
+    if row_count.empty:
+        return None
+    
+    if row_count['ROW_COUNT'].iloc[0] > SCATTER_BIN_MIN_ROWS:
+        binned = run_query(bin_2d(source_sql, x, y, nx, ny), params)
+        if binned.empty:
+            return None
+        
+        # Draw the Snowflake grid as-is; empty cells stay NaN (transparent)
+        grid = binned.pivot(index='BIN_Y', columns='BIN_X', values='ROW_COUNT').reindex(
+            index=range(1, ny + 1),
+            columns=range(1, nx + 1)
+        )
+        bounds = binned.iloc[0]
+        dx = (bounds['X_MAX'] - bounds['X_MIN']) / nx
+        dy = (bounds['Y_MAX'] - bounds['Y_MIN']) / ny
+        fig = go.Figure(go.Heatmap(
+            z=grid.to_numpy(),
+            x0=bounds['X_MIN'] + dx / 2,
+            dx=dx,
+            y0=bounds['Y_MIN'] + dy / 2,
+            dy=dy,
+            colorbar=dict(title='count')
+        ))
+        fig.update_layout(xaxis_title=x, yaxis_title=y)
+        return fig
+    
+    points = run_query(f"SELECT {x}, {y} FROM ({source_sql})", params)
+    if points.empty:
+        return None
+    
+    fig = go.Figure(go.Scattergl(
+        x=points[x.upper()].tolist(),
+        y=points[y.upper()].tolist(),
+        mode='markers'
+    ))
+    fig.update_layout(xaxis_title=x, yaxis_title=y)
+    return fig
+
+# Result sets produced by the combined dashboard query, in UNION ALL order.
+# Each entry lists the columns that result set populates and how to sort it
+# once it has been split back out of the combined frame.
+DASHBOARD_RESULTS = {
+    'metrics': {
+        'columns': ['TOTAL_TRANSACTIONS', 'UNIQUE_CUSTOMERS', 'TOTAL_REVENUE',
+                    'AVG_ORDER_VALUE', 'TOTAL_PROFIT', 'AVG_PROFIT_PER_TRANSACTION'],
+        'sort': None
+    },
+    'daily_revenue': {
+        'columns': ['TRANSACTION_DATE', 'DAILY_REVENUE'],
+        'sort': ('TRANSACTION_DATE', True)
+    },
+    'category': {
+        'columns': ['CATEGORY', 'REVENUE'],
+        'sort': ('REVENUE', False)
+    },
+    'top_products': {
+        'columns': ['PRODUCT_ID', 'CATEGORY', 'REVENUE', 'UNITS_SOLD'],
+        'sort': ('REVENUE', False)
+    },
+    'store_performance': {
+        'columns': ['STORE_TYPE', 'STORE_CITY', 'REVENUE'],
+        'sort': ('REVENUE', False)
+    },
+    'segments': {
+        'columns': ['CUSTOMER_SEGMENT', 'CUSTOMERS', 'REVENUE'],
+        'sort': ('REVENUE', False)
+    },
+    'loyalty': {
+        'columns': ['LOYALTY_STATUS', 'AVG_TRANSACTION_VALUE', 'CUSTOMER_COUNT'],
+        'sort': None
+    },
+    'daytype': {
+        'columns': ['DAY_TYPE', 'REVENUE'],
+        'sort': None
+    }
+}
+
+# Integer result columns, cast back from float after the combined frame is split
+INTEGER_COLUMNS = {
+    'TOTAL_TRANSACTIONS', 'UNIQUE_CUSTOMERS', 'PRODUCT_ID', 'UNITS_SOLD',
+    'CUSTOMERS', 'CUSTOMER_COUNT'
+}
+
+def build_dashboard_query(date_filter, filters):
+    """Build one query returning every dashboard result set, tagged by KIND"""
+    all_columns = []
+    for spec in DASHBOARD_RESULTS.values():
+        for column in spec['columns']:
+            if column not in all_columns:
+                all_columns.append(column)
+    
+    # Pad each result set with NULLs so all branches share one column list
+    branches = []
+    for kind, spec in DASHBOARD_RESULTS.items():
+        select_list = ',\n        '.join(
+            column if column in spec['columns'] else f"NULL AS {column}"
+            for column in all_columns
+        )
+        branches.append(f"""
+    SELECT
+        '{kind}' AS kind,
+        {select_list}
+    FROM {kind}""")
+    union_query = '\n    UNION ALL'.join(branches)
+    
+    # Only emit the category/store predicates that actually narrow the data
+    sales_filter = ''.join(f"\n            AND {f}" for f in filters)
+    daily_filter = f"WHERE {' AND '.join(filters)}" if filters else ""
+    
+    return f"""
+    WITH filtered_sales AS (
+        SELECT {', '.join(FACT_SALES_COLUMNS)}
+        FROM fact_sales
+        WHERE {date_filter}{sales_filter}
+    ),
+    daily_sales AS (
+        SELECT {', '.join(SALES_DAILY_COLUMNS)}
+        FROM agg_sales_daily
+        WHERE {date_filter}
+    ),
+    filtered_daily_sales AS (
+        SELECT {', '.join(SALES_DAILY_COLUMNS)}
+        FROM daily_sales
+        {daily_filter}
+    ),
+    metrics AS (
+        SELECT
+            APPROX_COUNT_DISTINCT(transaction_id) as total_transactions,
+            APPROX_COUNT_DISTINCT(customer_id) as unique_customers,
+            SUM(total_amount) as total_revenue,
+            AVG(total_amount) as avg_order_value,
+            SUM(gross_profit) as total_profit,
+            AVG(gross_profit) as avg_profit_per_transaction
+        FROM filtered_sales
+    ),
+    daily_revenue AS (
+        SELECT
+            transaction_date,
+            SUM(total_revenue) as daily_revenue
+        FROM filtered_daily_sales
+        GROUP BY transaction_date
+    ),
+    category AS (
+        SELECT
+            category,
+            SUM(total_revenue) as revenue
+        FROM filtered_daily_sales
+        WHERE category IS NOT NULL
+        GROUP BY category
+        ORDER BY revenue DESC
+        LIMIT 10
+    ),
+    top_products AS (
+        SELECT
+            product_id,
+            category,
+            SUM(total_amount) as revenue,
+            SUM(quantity) as units_sold
+        FROM filtered_sales
+        GROUP BY product_id, category
+        ORDER BY revenue DESC
+        LIMIT 10
+    ),
+    store_performance AS (
+        SELECT
+            store_type,
+            store_city,
+            SUM(total_revenue) as revenue
+        FROM filtered_daily_sales
+        WHERE store_type IS NOT NULL
+        GROUP BY store_type, store_city
+        ORDER BY revenue DESC
+        LIMIT 10
+    ),
+    segments AS (
+        SELECT
+            customer_segment,
+            HLL_ESTIMATE(HLL_COMBINE(customers_hll)) as customers,
+            SUM(total_revenue) as revenue
+        FROM daily_sales
+        WHERE customer_segment IS NOT NULL
+        GROUP BY customer_segment
+    ),
+    loyalty AS (
+        SELECT
+            CASE WHEN loyalty_member THEN 'Member' ELSE 'Non-Member' END as loyalty_status,
+            SUM(total_revenue) / SUM(line_items) as avg_transaction_value,
+            HLL_ESTIMATE(HLL_COMBINE(customers_hll)) as customer_count
+        FROM daily_sales
+        GROUP BY loyalty_status
+    ),
+    daytype AS (
+        SELECT
+            day_type,
+            SUM(total_revenue) as revenue
+        FROM filtered_daily_sales
+        WHERE day_type IS NOT NULL
+        GROUP BY day_type
+    )
+    {union_query}
+    """
+
+@st.cache_data(ttl=600)
+def load_dashboard_data(date_range, selected_categories, selected_store_types):
+    """Run the combined dashboard query and split it into one dataframe per result set"""
+    # Build filter conditions. An empty selection or one covering every option
+    # doesn't narrow the data, so no predicate is emitted for it at all.
+    categories, store_types = get_filter_options()
+    date_filter = "transaction_date BETWEEN %(start_date)s AND %(end_date)s"
+    params = {'start_date': date_range[0], 'end_date': date_range[1]}
+    filters = []
+    
+    # Category filter
+    if selected_categories and set(selected_categories) != set(categories):
+        filters.append("category IN (%(categories)s)")
+        params['categories'] = list(selected_categories)
+    
+    # Store filter
+    if selected_store_types and set(selected_store_types) != set(store_types):
+        filters.append("store_type IN (%(store_types)s)")
+        params['store_types'] = list(selected_store_types)
+    
+    combined = run_query(build_dashboard_query(date_filter, filters), params)
+    groups = dict(tuple(combined.groupby('KIND', observed=True))) if not combined.empty else {}
+    
+    data = {}
+    for kind, spec in DASHBOARD_RESULTS.items():
+        result = groups.get(kind, pd.DataFrame(columns=['KIND'] + spec['columns']))[spec['columns']].copy()
+        # NULL padding from the UNION ALL turns integer columns into floats
+        for column in INTEGER_COLUMNS.intersection(result.columns):
+            result[column] = result[column].astype('Int64')
+        # Drop labels that only occur in other result sets
+        for column in result.select_dtypes('category'):
+            result[column] = result[column].cat.remove_unused_categories()
+        if spec['sort']:
+            column, ascending = spec['sort']
+            result = result.sort_values(column, ascending=ascending)
+        data[kind] = result.reset_index(drop=True)
+    return data
+
 def main():
     # Header
     st.markdown('<p class="main-header">🛒 Retail Analytics Dashboard</p>', unsafe_allow_html=True)
@@ -74,45 +414,31 @@ def main():
     with st.sidebar:
         st.header("📊 Filters")
         
-        # Date range filter
+        # Date range filter, on day boundaries so cache keys stay stable all day
+        today = date.today()
         date_range = st.date_input(
             "Select Date Range",
-            value=(datetime.now() - timedelta(days=30), datetime.now()),
-            max_value=datetime.now()
+            value=(today - timedelta(days=30), today),
+            max_value=today
         )
         
-        # Get available categories
-        categories_query = """
-        SELECT DISTINCT category 
-        FROM fact_sales 
-        WHERE category IS NOT NULL 
-        ORDER BY category
-        """
-        categories_df = run_query(categories_query)
+        # Get available categories and store types
+        categories, store_types = get_filter_options()
         
-        if not categories_df.empty:
+        if categories:
             selected_categories = st.multiselect(
                 "Product Categories",
-                options=categories_df['CATEGORY'].tolist(),
-                default=categories_df['CATEGORY'].tolist()  # Select ALL by default
+                options=categories,
+                default=categories  # Select ALL by default
             )
         else:
             selected_categories = []
         
-        # Get available store types
-        store_types_query = """
-        SELECT DISTINCT store_type 
-        FROM fact_sales 
-        WHERE store_type IS NOT NULL 
-        ORDER BY store_type
-        """
-        store_types_df = run_query(store_types_query)
-        
-        if not store_types_df.empty:
+        if store_types:
             selected_store_types = st.multiselect(
                 "Store Types",
-                options=store_types_df['STORE_TYPE'].tolist(),
-                default=store_types_df['STORE_TYPE'].tolist()  # Select ALL by default
+                options=store_types,
+                default=store_types  # Select ALL by default
             )
         else:
             selected_store_types = []
@@ -120,41 +446,22 @@ def main():
         st.markdown("---")
         st.info("💡 Data refreshes every 10 minutes")
     
-    # Build filter conditions (FIXED for empty selections)
-    date_filter = f"transaction_date BETWEEN '{date_range[0]}' AND '{date_range[1]}'"
+    # The date input returns a single date while the range is being picked
+    if len(date_range) != 2:
+        st.info("Select an end date to load the dashboard")
+        return
     
-    # Category filter - handles empty list
-    if selected_categories and len(selected_categories) > 0:
-        category_list = ','.join([f"'{c}'" for c in selected_categories])
-        category_filter = f"category IN ({category_list})"
-    else:
-        category_filter = "1=1"
-    
-    # Store filter - handles empty list  
-    if selected_store_types and len(selected_store_types) > 0:
-        store_list = ','.join([f"'{s}'" for s in selected_store_types])
-        store_filter = f"store_type IN ({store_list})"
-    else:
-        store_filter = "1=1"
+    # Sorted so the same selection in a different order hits the same cache entry
+    data = load_dashboard_data(
+        tuple(date_range),
+        tuple(sorted(selected_categories)),
+        tuple(sorted(selected_store_types))
+    )
     
     # Key Metrics
     st.subheader("📈 Key Performance Indicators")
     
-    metrics_query = f"""
-    SELECT
-        COUNT(DISTINCT transaction_id) as total_transactions,
-        COUNT(DISTINCT customer_id) as unique_customers,
-        SUM(total_amount) as total_revenue,
-        AVG(total_amount) as avg_order_value,
-        SUM(gross_profit) as total_profit,
-        AVG(gross_profit) as avg_profit_per_transaction
-    FROM fact_sales
-    WHERE {date_filter}
-        AND {category_filter}
-        AND {store_filter}
-    """
-    
-    metrics = run_query(metrics_query)
+    metrics = data['metrics']
     
     if not metrics.empty:
         col1, col2, col3, col4 = st.columns(4)
@@ -190,25 +497,15 @@ def main():
     
     with col1:
         st.subheader("📅 Daily Revenue Trend")
-        daily_revenue_query = f"""
-        SELECT
-            transaction_date,
-            SUM(total_amount) as daily_revenue,
-            COUNT(DISTINCT transaction_id) as daily_transactions
-        FROM fact_sales
-        WHERE {date_filter}
-            AND {category_filter}
-            AND {store_filter}
-        GROUP BY transaction_date
-        ORDER BY transaction_date
-        """
-        daily_revenue = run_query(daily_revenue_query)
+        daily_revenue = data['daily_revenue']
         
         if not daily_revenue.empty:
+            # WebGL only pays off for larger traces; SVG is faster for small ones
+            scatter = go.Scattergl if len(daily_revenue) > SCATTERGL_MIN_ROWS else go.Scatter
             fig_revenue = go.Figure()
-            fig_revenue.add_trace(go.Scatter(
-                x=daily_revenue['TRANSACTION_DATE'],
-                y=daily_revenue['DAILY_REVENUE'],
+            fig_revenue.add_trace(scatter(
+                x=daily_revenue['TRANSACTION_DATE'].tolist(),
+                y=daily_revenue['DAILY_REVENUE'].tolist(),
                 mode='lines+markers',
                 name='Revenue',
                 line=dict(color='#1f77b4', width=2),
@@ -226,21 +523,7 @@ def main():
     
     with col2:
         st.subheader("🏷️ Revenue by Category")
-        category_query = f"""
-        SELECT
-            category,
-            SUM(total_amount) as revenue,
-            COUNT(DISTINCT transaction_id) as transactions
-        FROM fact_sales
-        WHERE {date_filter}
-            AND {category_filter}
-            AND {store_filter}
-            AND category IS NOT NULL
-        GROUP BY category
-        ORDER BY revenue DESC
-        LIMIT 10
-        """
-        category_data = run_query(category_query)
+        category_data = data['category']
         
         if not category_data.empty:
             fig_category = px.bar(
@@ -261,28 +544,16 @@ def main():
     
     with col1:
         st.subheader("🌟 Top 10 Products by Revenue")
-        top_products_query = f"""
-        SELECT
-            product_id,
-            category,
-            SUM(total_amount) as revenue,
-            SUM(quantity) as units_sold
-        FROM fact_sales
-        WHERE {date_filter}
-            AND {category_filter}
-            AND {store_filter}
-        GROUP BY product_id, category
-        ORDER BY revenue DESC
-        LIMIT 10
-        """
-        top_products = run_query(top_products_query)
+        top_products = data['top_products']
         
         if not top_products.empty:
+            # Formatted client-side, so the raw numeric columns ship as Arrow
             st.dataframe(
-                top_products.style.format({
-                    'REVENUE': '${:,.2f}',
-                    'UNITS_SOLD': '{:,.0f}'
-                }),
+                top_products,
+                column_config={
+                    'REVENUE': st.column_config.NumberColumn(format='$%.2f'),
+                    'UNITS_SOLD': st.column_config.NumberColumn(format='%d')
+                },
                 use_container_width=True,
                 height=350
             )
@@ -291,22 +562,7 @@ def main():
     
     with col2:
         st.subheader("🏪 Store Performance")
-        store_performance_query = f"""
-        SELECT
-            store_type,
-            store_city,
-            SUM(total_amount) as revenue,
-            COUNT(DISTINCT transaction_id) as transactions
-        FROM fact_sales
-        WHERE {date_filter}
-            AND {category_filter}
-            AND {store_filter}
-            AND store_type IS NOT NULL
-        GROUP BY store_type, store_city
-        ORDER BY revenue DESC
-        LIMIT 10
-        """
-        store_performance = run_query(store_performance_query)
+        store_performance = data['store_performance']
         
         if not store_performance.empty:
             fig_stores = px.treemap(
@@ -329,17 +585,7 @@ def main():
     
     with col1:
         st.markdown("**Customer Segments**")
-        segment_query = f"""
-        SELECT
-            customer_segment,
-            COUNT(DISTINCT customer_id) as customers,
-            SUM(total_amount) as revenue
-        FROM fact_sales
-        WHERE {date_filter} AND customer_segment IS NOT NULL
-        GROUP BY customer_segment
-        ORDER BY revenue DESC
-        """
-        segments = run_query(segment_query)
+        segments = data['segments']
         
         if not segments.empty:
             fig_segments = px.pie(
@@ -355,16 +601,7 @@ def main():
     
     with col2:
         st.markdown("**Loyalty Program Impact**")
-        loyalty_query = f"""
-        SELECT
-            CASE WHEN loyalty_member THEN 'Member' ELSE 'Non-Member' END as loyalty_status,
-            AVG(total_amount) as avg_transaction_value,
-            COUNT(DISTINCT customer_id) as customer_count
-        FROM fact_sales
-        WHERE {date_filter}
-        GROUP BY loyalty_status
-        """
-        loyalty_data = run_query(loyalty_query)
+        loyalty_data = data['loyalty']
         
         if not loyalty_data.empty:
             fig_loyalty = px.bar(
@@ -382,19 +619,7 @@ def main():
     
     with col3:
         st.markdown("**Sales by Day Type**")
-        daytype_query = f"""
-        SELECT
-            day_type,
-            SUM(total_amount) as revenue,
-            COUNT(DISTINCT transaction_id) as transactions
-        FROM fact_sales
-        WHERE {date_filter}
-            AND {category_filter}
-            AND {store_filter}
-            AND day_type IS NOT NULL
-        GROUP BY day_type
-        """
-        daytype_data = run_query(daytype_query)
+        daytype_data = data['daytype']
         
         if not daytype_data.empty:
             fig_daytype = px.bar(
@@ -0,0 +1,31 @@
+{{ config(cluster_by=['transaction_date', 'category']) }}
+
+-- Daily sales rollup used by the dashboard, at the grain of every filter and
+-- breakdown it shows. Distinct customer counts are kept as HLL states so they
+-- can be recombined across any subset of these columns.
+WITH sales AS (
+    SELECT * FROM {{ ref('fact_sales') }}
+)
+
+SELECT
+    transaction_date,
+    category,
+    store_type,
+    store_city,
+    day_type,
+    customer_segment,
+    loyalty_member,
+    SUM(total_amount) AS total_revenue,
+    SUM(gross_profit) AS total_profit,
+    SUM(quantity) AS units_sold,
+    COUNT(*) AS line_items,
+    HLL_ACCUMULATE(customer_id) AS customers_hll
+FROM sales
+GROUP BY
+    transaction_date,
+    category,
+    store_type,
+    store_city,
+    day_type,
+    customer_segment,
+    loyalty_member
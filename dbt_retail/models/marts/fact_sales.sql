@@ -1,3 +1,5 @@
+{{ config(cluster_by=['transaction_date', 'category']) }}
+
 WITH transactions AS (
     SELECT * FROM {{ ref('stg_transactions') }}
 ),
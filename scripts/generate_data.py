@@ -7,37 +7,80 @@ import pandas as pd
 import numpy as np
 from faker import Faker
 from datetime import datetime, timedelta
-import random
 import os
 
 fake = Faker()
 Faker.seed(42)
-np.random.seed(42)
+# Single seeded generator for every non-Faker random draw in this module
+rng = np.random.default_rng(42)
+
+# Faker providers are called at most this many times per field; larger draws
+# sample rows from a pool of this size rather than calling Faker once per row
+FAKER_POOL_SIZE = 5000
 
 class RetailDataGenerator:
     def __init__(self, output_dir='data'):
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
         
+    def _save(self, df, name):
+        """Write a dataset to the output directory as zstd-compressed Parquet"""
+        df.to_parquet(f'{self.output_dir}/{name}.parquet', engine='pyarrow', compression='zstd', index=False)
+    
+    def _faker_values(self, provider, n):
+        """
+        Draw n values from a Faker provider, calling it at most FAKER_POOL_SIZE times
+        Up to that size every row gets its own fresh value; larger draws sample
+        rows from a pool of FAKER_POOL_SIZE values
+        """
+        if n <= FAKER_POOL_SIZE:
+            return np.array([provider() for _ in range(n)])
+        pool = np.array([provider() for _ in range(FAKER_POOL_SIZE)])
+        return rng.choice(pool, n)
+    
+    def _line_totals(self, retail_prices, discount_pct, quantities):
+        """
+        Compute rounded unit price, discount amount and line total per item
+        Works in place on three output arrays instead of allocating a
+        temporary for every intermediate expression
+        """
+        unit_prices = 1 - discount_pct
+        unit_prices *= retail_prices
+        
+        total_amounts = unit_prices * quantities
+        np.round(total_amounts, 2, out=total_amounts)
+        
+        discount_amounts = retail_prices * discount_pct
+        discount_amounts *= quantities
+        np.round(discount_amounts, 2, out=discount_amounts)
+        
+        np.round(unit_prices, 2, out=unit_prices)
+        return unit_prices, discount_amounts, total_amounts
+    
+    def _random_dates(self, start_days_ago, end_days_ago, n):
+        """Draw n dates uniformly between start_days_ago and end_days_ago"""
+        today = pd.Timestamp.today().normalize()
+        days_ago = rng.integers(end_days_ago, start_days_ago + 1, n)
+        return (today - pd.to_timedelta(days_ago, unit='D')).date
+    
     def generate_stores(self, n=50):
         """Generate store data"""
-        stores = []
         store_types = ['Supermarket', 'Convenience', 'Hypermarket', 'Express']
         
-        for i in range(1, n + 1):
-            stores.append({
-                'store_id': i,
-                'store_name': f"{fake.city()} {random.choice(store_types)}",
-                'store_type': random.choice(store_types),
-                'city': fake.city(),
-                'state': fake.state_abbr(),
-                'country': 'USA',
-                'opened_date': fake.date_between(start_date='-10y', end_date='-1y'),
-                'size_sqft': random.randint(5000, 50000)
-            })
-        
-        df = pd.DataFrame(stores)
-        df.to_csv(f'{self.output_dir}/stores.csv', index=False)
+        df = pd.DataFrame({
+            'store_id': np.arange(1, n + 1),
+            'store_name': np.char.add(
+                np.char.add(self._faker_values(fake.city, n), ' '),
+                rng.choice(store_types, n)
+            ),
+            'store_type': rng.choice(store_types, n),
+            'city': self._faker_values(fake.city, n),
+            'state': self._faker_values(fake.state_abbr, n),
+            'country': 'USA',
+            'opened_date': self._random_dates(10 * 365, 365, n),
+            'size_sqft': rng.integers(5000, 50001, n)
+        })
+        self._save(df, 'stores')
         print(f"✓ Generated {len(df)} stores")
         return df
     
@@ -58,7 +101,7 @@ class RetailDataGenerator:
             for subcategory in subcategories:
                 num_products = n // (len(categories) * len(subcategories))
                 for _ in range(num_products):
-                    base_price = random.uniform(10, 500)
+                    base_price = rng.uniform(10, 500)
                     products.append({
                         'product_id': product_id,
                         'product_name': f"{fake.word().capitalize()} {subcategory}",
@@ -73,87 +116,95 @@ class RetailDataGenerator:
                     product_id += 1
         
         df = pd.DataFrame(products)
-        df.to_csv(f'{self.output_dir}/products.csv', index=False)
+        self._save(df, 'products')
         print(f"✓ Generated {len(df)} products")
         return df
     
     def generate_customers(self, n=10000):
         """Generate customer data"""
-        customers = []
-        
-        for i in range(1, n + 1):
-            signup_date = fake.date_between(start_date='-5y', end_date='today')
-            customers.append({
-                'customer_id': i,
-                'first_name': fake.first_name(),
-                'last_name': fake.last_name(),
-                'email': fake.email(),
-                'phone': fake.phone_number(),
-                'address': fake.street_address(),
-                'city': fake.city(),
-                'state': fake.state_abbr(),
-                'zip_code': fake.zipcode(),
-                'signup_date': signup_date,
-                'customer_segment': random.choice(['Premium', 'Standard', 'Basic']),
-                'loyalty_member': random.choice([True, False])
-            })
-        
-        df = pd.DataFrame(customers)
-        df.to_csv(f'{self.output_dir}/customers.csv', index=False)
+        customer_ids = np.arange(1, n + 1)
+        first_names = self._faker_values(fake.first_name, n)
+        last_names = self._faker_values(fake.last_name, n)
+        
+        # Pooled names repeat, so the customer ID keeps each email unique
+        emails = np.char.add(
+            np.char.add(np.char.lower(first_names), '.'),
+            np.char.add(np.char.lower(last_names), '.')
+        )
+        emails = np.char.add(np.char.add(emails, customer_ids.astype(str)), '@example.com')
+        
+        df = pd.DataFrame({
+            'customer_id': customer_ids,
+            'first_name': first_names,
+            'last_name': last_names,
+            'email': emails,
+            'phone': [fake.phone_number() for _ in range(n)],
+            'address': [fake.street_address() for _ in range(n)],
+            'city': self._faker_values(fake.city, n),
+            'state': self._faker_values(fake.state_abbr, n),
+            'zip_code': self._faker_values(fake.zipcode, n),
+            'signup_date': self._random_dates(5 * 365, 0, n),
+            'customer_segment': rng.choice(['Premium', 'Standard', 'Basic'], n),
+            'loyalty_member': rng.choice([True, False], n)
+        })
+        self._save(df, 'customers')
         print(f"✓ Generated {len(df)} customers")
         return df
     
     def generate_transactions(self, stores_df, products_df, customers_df, days=365):
         """Generate transaction data"""
-        transactions = []
-        transaction_id = 1
-        
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
+        dates = pd.date_range(start_date.date(), periods=days, freq='D')
         
-        # Generate transactions for each day
-        for day in range(days):
-            current_date = start_date + timedelta(days=day)
-            
-            # More transactions on weekends
-            is_weekend = current_date.weekday() >= 5
-            num_transactions = random.randint(500, 800) if is_weekend else random.randint(300, 500)
-            
-            for _ in range(num_transactions):
-                store_id = random.choice(stores_df['store_id'].tolist())
-                customer_id = random.choice(customers_df['customer_id'].tolist())
-                
-                # Number of items in transaction
-                num_items = random.randint(1, 8)
-                transaction_items = []
-                
-                for _ in range(num_items):
-                    product = products_df.sample(1).iloc[0]
-                    quantity = random.randint(1, 3)
-                    
-                    # Apply random discount
-                    discount_pct = random.choice([0, 0, 0, 0.05, 0.10, 0.15, 0.20])
-                    unit_price = product['retail_price'] * (1 - discount_pct)
-                    
-                    transaction_items.append({
-                        'transaction_id': transaction_id,
-                        'transaction_date': current_date.date(),
-                        'transaction_time': f"{random.randint(8, 21):02d}:{random.randint(0, 59):02d}:00",
-                        'store_id': store_id,
-                        'customer_id': customer_id,
-                        'product_id': product['product_id'],
-                        'quantity': quantity,
-                        'unit_price': round(unit_price, 2),
-                        'discount_amount': round(product['retail_price'] * discount_pct * quantity, 2),
-                        'total_amount': round(unit_price * quantity, 2),
-                        'payment_method': random.choice(['Credit Card', 'Debit Card', 'Cash', 'Mobile Payment'])
-                    })
-                
-                transactions.extend(transaction_items)
-                transaction_id += 1
+        # More transactions on weekends
+        is_weekend = dates.weekday >= 5
+        num_transactions = np.where(
+            is_weekend,
+            rng.integers(500, 801, days),
+            rng.integers(300, 501, days)
+        )
+        total_transactions = num_transactions.sum()
+        
+        # Transaction level attributes, one entry per transaction
+        transaction_ids = np.arange(1, total_transactions + 1)
+        transaction_dates = np.repeat(dates.date, num_transactions)
+        store_ids = rng.choice(stores_df['store_id'].to_numpy(), total_transactions)
+        customer_ids = rng.choice(customers_df['customer_id'].to_numpy(), total_transactions)
+        
+        # Number of items in each transaction, expanded to one row per item
+        num_items = rng.integers(1, 9, total_transactions)
+        total_items = num_items.sum()
+        
+        # Index per-column arrays so product IDs keep their integer dtype
+        product_idx = rng.integers(0, len(products_df), total_items)
+        product_ids = products_df['product_id'].to_numpy()[product_idx]
+        retail_prices = products_df['retail_price'].to_numpy()[product_idx]
+        quantities = rng.integers(1, 4, total_items)
+        
+        # Apply random discount
+        discount_pct = rng.choice([0, 0, 0, 0.05, 0.10, 0.15, 0.20], total_items)
+        unit_prices, discount_amounts, total_amounts = self._line_totals(
+            retail_prices, discount_pct, quantities
+        )
+        
+        # Every HH:MM:00 between 08:00 and 21:59, sampled uniformly per item
+        time_slots = np.array([f"{h:02d}:{m:02d}:00" for h in range(8, 22) for m in range(60)])
         
-        df = pd.DataFrame(transactions)
-        df.to_csv(f'{self.output_dir}/transactions.csv', index=False)
+        df = pd.DataFrame({
+            'transaction_id': np.repeat(transaction_ids, num_items),
+            'transaction_date': np.repeat(transaction_dates, num_items),
+            'transaction_time': time_slots[rng.integers(0, len(time_slots), total_items)],
+            'store_id': np.repeat(store_ids, num_items),
+            'customer_id': np.repeat(customer_ids, num_items),
+            'product_id': product_ids,
+            'quantity': quantities,
+            'unit_price': unit_prices,
+            'discount_amount': discount_amounts,
+            'total_amount': total_amounts,
+            'payment_method': rng.choice(['Credit Card', 'Debit Card', 'Cash', 'Mobile Payment'], total_items)
+        })
+        self._save(df, 'transactions')
         print(f"✓ Generated {len(df)} transaction records")
         return df
     
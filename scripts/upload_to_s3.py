@@ -4,10 +4,26 @@ Uploads generated retail data to AWS S3
 """
 
 import boto3
+from boto3.s3.transfer import TransferConfig, create_transfer_manager
+from botocore.exceptions import ClientError
+import hashlib
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+# Files are uploaded concurrently, and large files in concurrent 8 MB parts.
+# 'auto' picks the AWS CRT transfer client when awscrt is installed and the
+# host is one it is optimized for, and the classic s3transfer client otherwise.
+MAX_UPLOAD_WORKERS = 16
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=32,
+    use_threads=True,
+    preferred_transfer_client='auto'
+)
+
 class S3Uploader:
     def __init__(self, bucket_name, aws_access_key=None, aws_secret_key=None, region='us-east-1'):
         """
@@ -27,6 +43,9 @@ class S3Uploader:
         
         self.bucket_name = bucket_name
         
+        # One transfer manager shared by every upload from this uploader
+        self.transfer_manager = create_transfer_manager(self.s3_client, TRANSFER_CONFIG)
+        
     def create_bucket_if_not_exists(self):
         """Create S3 bucket if it doesn't exist"""
         try:
@@ -40,10 +59,43 @@ class S3Uploader:
                 print(f"✗ Error creating bucket: {e}")
                 raise
     
+    def file_md5(self, local_path):
+        """Compute the MD5 hex digest of a local file"""
+        md5 = hashlib.md5()
+        with open(local_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                md5.update(chunk)
+        return md5.hexdigest()
+    
+    def is_unchanged(self, s3_path, md5):
+        """
+        Check whether the object at s3_path already has the given MD5
+        Multipart uploads don't have an MD5 ETag, so the digest is also
+        stored in the object's metadata and checked first
+        """
+        try:
+            response = self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_path)
+        except ClientError:
+            return False
+        
+        if response.get('Metadata', {}).get('md5') == md5:
+            return True
+        return response['ETag'].strip('"') == md5
+    
     def upload_file(self, local_path, s3_path):
-        """Upload a single file to S3"""
+        """Upload a single file to S3, skipping it if S3 already has identical content"""
         try:
-            self.s3_client.upload_file(local_path, self.bucket_name, s3_path)
+            md5 = self.file_md5(local_path)
+            if self.is_unchanged(s3_path, md5):
+                print(f"  - Skipped {local_path} (unchanged in s3://{self.bucket_name}/{s3_path})")
+                return True
+            
+            self.transfer_manager.upload(
+                local_path,
+                self.bucket_name,
+                s3_path,
+                extra_args={'Metadata': {'md5': md5}}
+            ).result()
             file_size = os.path.getsize(local_path) / 1024  # KB
             print(f"  ✓ Uploaded {local_path} → s3://{self.bucket_name}/{s3_path} ({file_size:.2f} KB)")
             return True
@@ -52,34 +104,40 @@ class S3Uploader:
             return False
     
     def upload_directory(self, local_dir, s3_prefix):
-        """Upload all CSV files from a directory to S3"""
+        """Upload all Parquet files from a directory to S3 in parallel"""
         local_path = Path(local_dir)
         
         if not local_path.exists():
             print(f"✗ Directory '{local_dir}' does not exist")
             return False
         
-        csv_files = list(local_path.glob('*.csv'))
+        data_files = list(local_path.glob('*.parquet'))
         
-        if not csv_files:
-            print(f"✗ No CSV files found in '{local_dir}'")
+        if not data_files:
+            print(f"✗ No Parquet files found in '{local_dir}'")
             return False
         
-        print(f"\nUploading {len(csv_files)} files from '{local_dir}'...")
+        print(f"\nUploading {len(data_files)} files from '{local_dir}'...")
         print("-" * 60)
         
-        success_count = 0
-        for csv_file in csv_files:
-            # Create S3 path with date partition
-            date_str = datetime.now().strftime('%Y-%m-%d')
-            s3_path = f"{s3_prefix}/{csv_file.stem}/date={date_str}/{csv_file.name}"
-            
-            if self.upload_file(str(csv_file), s3_path):
-                success_count += 1
+        # Create S3 paths with date partition
+        date_str = datetime.now().strftime('%Y-%m-%d')
+        s3_paths = [
+            f"{s3_prefix}/{data_file.stem}/date={date_str}/{data_file.name}"
+            for data_file in data_files
+        ]
+        
+        with ThreadPoolExecutor(max_workers=MAX_UPLOAD_WORKERS) as executor:
+            results = executor.map(self.upload_file, [str(f) for f in data_files], s3_paths)
+            success_count = sum(results)
         
         print("-" * 60)
-        print(f"✓ Successfully uploaded {success_count}/{len(csv_files)} files")
-        return success_count == len(csv_files)
+        print(f"✓ Successfully uploaded {success_count}/{len(data_files)} files")
+        return success_count == len(data_files)
+    
+    def close(self):
+        """Wait for in-flight transfers and release the transfer manager's threads"""
+        self.transfer_manager.shutdown()
     
     def list_files(self, prefix=''):
         """List files in S3 bucket"""
@@ -119,7 +177,10 @@ def main():
     uploader.create_bucket_if_not_exists()
     
     # Upload data
-    success = uploader.upload_directory(DATA_DIR, S3_PREFIX)
+    try:
+        success = uploader.upload_directory(DATA_DIR, S3_PREFIX)
+    finally:
+        uploader.close()
     
     if success:
         print("\n✓ All files uploaded successfully!")
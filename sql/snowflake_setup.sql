@@ -22,12 +22,8 @@ CREATE SCHEMA IF NOT EXISTS ANALYTICS;
 -- Step 2: Create File Format
 -- ============================================================
 
-CREATE OR REPLACE FILE FORMAT csv_format
-  TYPE = 'CSV'
-  FIELD_DELIMITER = ','
-  SKIP_HEADER = 1
-  NULL_IF = ('NULL', 'null', '')
-  EMPTY_FIELD_AS_NULL = TRUE
+CREATE OR REPLACE FILE FORMAT parquet_format
+  TYPE = 'PARQUET'
   COMPRESSION = AUTO;
 
 -- Step 3: Create External Stage (pointing to S3)
@@ -36,7 +32,7 @@ CREATE OR REPLACE FILE FORMAT csv_format
 -- IMPORTANT: Update these three values before running:
 CREATE OR REPLACE STAGE s3_stage
   URL = 's3://retail-pipeline-data-YOURNAME/raw/'  -- ← CHANGE THIS to your bucket name
-  FILE_FORMAT = csv_format
+  FILE_FORMAT = parquet_format
   CREDENTIALS = (
     AWS_KEY_ID = 'YOUR_AWS_ACCESS_KEY_ID'          -- ← CHANGE THIS to your AWS Access Key
     AWS_SECRET_KEY = 'YOUR_AWS_SECRET_KEY'         -- ← CHANGE THIS to your AWS Secret Key
@@ -115,30 +111,51 @@ CREATE OR REPLACE TABLE transactions (
 
 -- Load Stores
 COPY INTO stores (store_id, store_name, store_type, city, state, country, opened_date, size_sqft)
-FROM @s3_stage/stores/
-FILE_FORMAT = csv_format
-PATTERN = '.*stores.*.csv'
+FROM (
+  SELECT $1:store_id::INTEGER, $1:store_name::VARCHAR, $1:store_type::VARCHAR, $1:city::VARCHAR,
+         $1:state::VARCHAR, $1:country::VARCHAR, $1:opened_date::DATE, $1:size_sqft::INTEGER
+  FROM @s3_stage/stores/
+)
+FILE_FORMAT = parquet_format
+PATTERN = '.*stores.*[.]parquet'
 ON_ERROR = 'CONTINUE';
 
 -- Load Products
 COPY INTO products (product_id, product_name, category, subcategory, brand, cost_price, retail_price, supplier, created_date)
-FROM @s3_stage/products/
-FILE_FORMAT = csv_format
-PATTERN = '.*products.*.csv'
+FROM (
+  SELECT $1:product_id::INTEGER, $1:product_name::VARCHAR, $1:category::VARCHAR, $1:subcategory::VARCHAR,
+         $1:brand::VARCHAR, $1:cost_price::DECIMAL(10,2), $1:retail_price::DECIMAL(10,2),
+         $1:supplier::VARCHAR, $1:created_date::DATE
+  FROM @s3_stage/products/
+)
+FILE_FORMAT = parquet_format
+PATTERN = '.*products.*[.]parquet'
 ON_ERROR = 'CONTINUE';
 
 -- Load Customers
 COPY INTO customers (customer_id, first_name, last_name, email, phone, address, city, state, zip_code, signup_date, customer_segment, loyalty_member)
-FROM @s3_stage/customers/
-FILE_FORMAT = csv_format
-PATTERN = '.*customers.*.csv'
+FROM (
+  SELECT $1:customer_id::INTEGER, $1:first_name::VARCHAR, $1:last_name::VARCHAR, $1:email::VARCHAR,
+         $1:phone::VARCHAR, $1:address::VARCHAR, $1:city::VARCHAR, $1:state::VARCHAR,
+         $1:zip_code::VARCHAR, $1:signup_date::DATE, $1:customer_segment::VARCHAR,
+         $1:loyalty_member::BOOLEAN
+  FROM @s3_stage/customers/
+)
+FILE_FORMAT = parquet_format
+PATTERN = '.*customers.*[.]parquet'
 ON_ERROR = 'CONTINUE';
 
 -- Load Transactions
 COPY INTO transactions (transaction_id, transaction_date, transaction_time, store_id, customer_id, product_id, quantity, unit_price, discount_amount, total_amount, payment_method)
-FROM @s3_stage/transactions/
-FILE_FORMAT = csv_format
-PATTERN = '.*transactions.*.csv'
+FROM (
+  SELECT $1:transaction_id::INTEGER, $1:transaction_date::DATE, $1:transaction_time::TIME,
+         $1:store_id::INTEGER, $1:customer_id::INTEGER, $1:product_id::INTEGER,
+         $1:quantity::INTEGER, $1:unit_price::DECIMAL(10,2), $1:discount_amount::DECIMAL(10,2),
+         $1:total_amount::DECIMAL(10,2), $1:payment_method::VARCHAR
+  FROM @s3_stage/transactions/
+)
+FILE_FORMAT = parquet_format
+PATTERN = '.*transactions.*[.]parquet'
 ON_ERROR = 'CONTINUE';
 
 -- Step 6: Verify Data Load